@@ -1,25 +1,26 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
-from fastapi.responses import FileResponse
-from pydantic import BaseModel
-from typing import List
-import shutil
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Query
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+import threading
 import uuid
+from contextlib import ExitStack
 from pathlib import Path
 from ..services.pdf_service import PDFService
 from ..services.cleanup_service import CleanupService
+from ..services.search_service import get_search_index
+from ..services.storage_service import LocalStorage, get_storage, UPLOADS, OUTPUT
+from ..services.tile_cache import get_tile_cache
 from ..core.config import get_settings
 from ..core.security import RequireAPIKey, RequireAdminKey
 
 router = APIRouter()
 settings = get_settings()
 
-# Define a directory to store uploaded files
-UPLOAD_DIR = settings.uploads_dir
-UPLOAD_DIR.mkdir(exist_ok=True)
-
-# Define a directory to store generated files
-OUTPUT_DIR = settings.output_dir
-OUTPUT_DIR.mkdir(exist_ok=True)
+# Storage (S3 round trips) and PDF processing calls block, so the handlers
+# making them are plain functions that FastAPI runs in its threadpool
+# instead of on the event loop.
 
 
 class PageInfo(BaseModel):
@@ -29,9 +30,28 @@ class PageInfo(BaseModel):
     rotation: int = 0
 
 
+class OptimizeOptions(BaseModel):
+    target_dpi: int = Field(150, ge=36, le=600)
+    jpeg_quality: int = Field(75, ge=1, le=95)
+
+
 class CreatePDFRequest(BaseModel):
     pages: List[PageInfo]
     filename: str = "merged_document.pdf"
+    optimize: Optional[OptimizeOptions] = None
+
+
+class ExportImagesRequest(BaseModel):
+    # Exactly one of source_pdf, result_id or pages
+    source_pdf: Optional[str] = None
+    result_id: Optional[str] = None
+    pages: Optional[List[PageInfo]] = None
+    # e.g. "1-3,7"; applies to the document pages or the page list
+    page_ranges: Optional[str] = None
+    format: Literal["png", "jpeg", "webp"] = "png"
+    dpi: int = Field(150, ge=36, le=600)
+    quality: int = Field(85, ge=1, le=100)
+    filename: str = "pages.zip"
 
 
 @router.get("/health", tags=["health"])
@@ -45,7 +65,7 @@ async def version():
 
 
 @router.post("/upload", tags=["pdf"])
-async def upload_pdf(file: UploadFile = File(...), _: bool = RequireAPIKey):
+def upload_pdf(file: UploadFile = File(...), _: bool = RequireAPIKey):
     if file.content_type != "application/pdf":
         raise HTTPException(
             status_code=400, detail="Invalid file type. Only PDFs are allowed."
@@ -57,15 +77,16 @@ async def upload_pdf(file: UploadFile = File(...), _: bool = RequireAPIKey):
         if not safe_filename:
             raise HTTPException(status_code=400, detail="Invalid filename.")
 
-        file_path = UPLOAD_DIR / safe_filename
-
-        with file_path.open("wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        storage = get_storage()
+        storage.save(UPLOADS, safe_filename, file.file)
+        # A re-upload under the same name must not serve stale tiles
+        get_tile_cache().invalidate(safe_filename)
 
         # Process PDF to extract pages
         try:
-            pages = PDFService.extract_pages(file_path)
-            pdf_info = PDFService.get_pdf_info(file_path)
+            with storage.local_copy(UPLOADS, safe_filename) as file_path:
+                pages = PDFService.extract_pages(file_path, get_search_index())
+                pdf_info = PDFService.get_pdf_info(file_path)
 
             return {
                 "message": "File uploaded and processed successfully",
@@ -88,13 +109,13 @@ async def upload_pdf(file: UploadFile = File(...), _: bool = RequireAPIKey):
 
 
 @router.post("/create-pdf", tags=["pdf"])
-async def create_pdf(request: CreatePDFRequest, _: bool = RequireAPIKey):
+def create_pdf(request: CreatePDFRequest, _: bool = RequireAPIKey):
     """Create a new PDF from reordered pages."""
     try:
+        storage = get_storage()
         # Generate unique filename
         unique_id = uuid.uuid4().hex[:8]
-        output_filename = f"{unique_id}_{request.filename}"
-        output_path = OUTPUT_DIR / output_filename
+        output_filename = f"{unique_id}_{Path(request.filename).name}"
 
         # Convert request pages to the format expected by the service
         page_order = [
@@ -107,37 +128,251 @@ async def create_pdf(request: CreatePDFRequest, _: bool = RequireAPIKey):
             for page in request.pages
         ]
 
+        optimize = None
+        if request.optimize is not None:
+            optimize = {
+                "target_dpi": request.optimize.target_dpi,
+                "jpeg_quality": request.optimize.jpeg_quality,
+                "max_workers": settings.pdf_workers,
+            }
+
         # Create the PDF
-        result = PDFService.create_pdf_from_pages(page_order, output_path, UPLOAD_DIR)
+        with storage.writable_path(OUTPUT, output_filename) as output_path:
+            result = PDFService.create_pdf_from_pages(
+                page_order, output_path, storage, optimize
+            )
 
-        return {
+        response = {
             "message": "PDF created successfully",
             "result_id": unique_id,
             "filename": output_filename,
             "page_count": result["page_count"],
             "file_size": result["file_size"],
         }
+        if optimize is not None:
+            response["optimization"] = {
+                "bytes_before": result["original_size"],
+                "bytes_after": result["file_size"],
+                "images_optimized": result["images_optimized"],
+            }
+
+        return response
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Could not create PDF: {e}")
 
 
+@router.post("/export-images", tags=["pdf"])
+def export_images(request: ExportImagesRequest, _: bool = RequireAPIKey):
+    """Render pages to images and stream them as a ZIP archive."""
+    sources = [request.source_pdf, request.result_id, request.pages]
+    if sum(source is not None for source in sources) != 1:
+        raise HTTPException(
+            status_code=400,
+            detail="Provide exactly one of source_pdf, result_id or pages.",
+        )
+
+    # Source copies stay pinned until the archive has been streamed
+    pinned_sources = ExitStack()
+
+    try:
+        storage = get_storage()
+
+        if request.pages is not None:
+            # Resolve each source once and check its pages exist
+            page_counts = {}
+            jobs = []
+            for page in request.pages:
+                if page.source_pdf not in page_counts:
+                    pdf_path = pinned_sources.enter_context(
+                        storage.local_copy(UPLOADS, page.source_pdf)
+                    )
+                    info = PDFService.get_pdf_info(pdf_path)
+                    page_counts[page.source_pdf] = (pdf_path, info["page_count"])
+
+                pdf_path, page_count = page_counts[page.source_pdf]
+                if not 1 <= page.page_number <= page_count:
+                    raise ValueError(
+                        f"Page {page.page_number} not found in {page.source_pdf}"
+                    )
+                jobs.append(
+                    {
+                        "pdf_path": pdf_path,
+                        "page_number": page.page_number,
+                        # Like create-pdf, 0 keeps the page's own rotation
+                        "rotation": page.rotation or None,
+                    }
+                )
+
+            selected = PDFService.parse_page_ranges(request.page_ranges, len(jobs))
+            jobs = [jobs[index - 1] for index in selected]
+        else:
+            if request.source_pdf is not None:
+                area, name = UPLOADS, request.source_pdf
+            else:
+                file_info = storage.find(OUTPUT, f"{request.result_id}_")
+                if not file_info:
+                    raise FileNotFoundError(request.result_id)
+                area, name = OUTPUT, file_info["name"]
+            pdf_path = pinned_sources.enter_context(storage.local_copy(area, name))
+
+            page_count = PDFService.get_pdf_info(pdf_path)["page_count"]
+            selected = PDFService.parse_page_ranges(request.page_ranges, page_count)
+            jobs = [
+                {"pdf_path": pdf_path, "page_number": page_number}
+                for page_number in selected
+            ]
+
+    except FileNotFoundError as e:
+        pinned_sources.close()
+        raise HTTPException(status_code=404, detail=f"PDF not found: {e}")
+    except ValueError as e:
+        pinned_sources.close()
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        pinned_sources.close()
+        raise HTTPException(status_code=500, detail=f"Could not export images: {e}")
+
+    # Whoever takes this first releases the pins: the generator once the
+    # archive is streamed, or the background task if streaming never
+    # started. After a client disconnect the background task can run while
+    # the generator is still rendering in the threadpool.
+    release_claim = threading.Lock()
+
+    def stream_archive():
+        if not release_claim.acquire(blocking=False):
+            return
+        with pinned_sources:
+            yield from PDFService.export_page_images(
+                jobs,
+                image_format=request.format,
+                dpi=request.dpi,
+                quality=request.quality,
+                max_workers=settings.pdf_workers,
+            )
+
+    def release_unstreamed():
+        if release_claim.acquire(blocking=False):
+            pinned_sources.close()
+
+    archive_name = Path(request.filename).name or "pages.zip"
+    return StreamingResponse(
+        stream_archive(),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{archive_name}"'},
+        background=BackgroundTask(release_unstreamed),
+    )
+
+
+@router.get("/search", tags=["pdf"])
+def search_pages(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    _: bool = RequireAPIKey,
+):
+    """Find uploaded pages whose text matches the query."""
+    try:
+        storage = get_storage()
+        results = get_search_index().search(
+            q, limit, source_exists=lambda name: storage.exists(UPLOADS, name)
+        )
+        return {
+            "query": q,
+            "results": results,
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Could not search pages: {e}")
+
+
+@router.get("/tiles/{source_pdf}/{page_number}", tags=["pdf"])
+def get_tile_pyramid(source_pdf: str, page_number: int, _: bool = RequireAPIKey):
+    """
+    Describe the zoom levels available for tiled page preview.
+
+    The returned version identifies the document content and must be passed
+    as the v parameter of tile URLs.
+    """
+    try:
+        storage = get_storage()
+        version = storage.version(UPLOADS, source_pdf)
+        with storage.local_copy(UPLOADS, source_pdf) as pdf_path:
+            pyramid = PDFService.get_tile_pyramid(pdf_path, page_number)
+        return {"version": version, **pyramid}
+    except (FileNotFoundError, ValueError) as e:
+        raise HTTPException(status_code=404, detail=f"Page not found: {e}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Could not describe tiles: {e}")
+
+
+@router.get("/tiles/{source_pdf}/{page_number}/{zoom}/{x}/{y}", tags=["pdf"])
+def get_tile(
+    source_pdf: str,
+    page_number: int,
+    zoom: int,
+    x: int,
+    y: int,
+    v: str = Query(..., description="Document version from the tile pyramid"),
+    _: bool = RequireAPIKey,
+):
+    """Render one PNG tile of a page region at the given zoom level."""
+    try:
+        # Checked before the cache so an outdated version is always
+        # rejected, whether or not its tiles are still cached
+        storage = get_storage()
+        if storage.version(UPLOADS, source_pdf) != v:
+            raise FileNotFoundError(f"{source_pdf} has changed, reload the pyramid")
+
+        tile_cache = get_tile_cache()
+        key = (source_pdf, v, page_number, zoom, x, y)
+        tile = tile_cache.get(key)
+
+        if tile is None:
+            with storage.local_copy(UPLOADS, source_pdf) as pdf_path:
+                tile = PDFService.render_tile(pdf_path, page_number, zoom, x, y)
+            tile_cache.put(key, tile)
+
+        # The URL names a specific version, so the tile never changes
+        return Response(
+            content=tile,
+            media_type="image/png",
+            headers={"Cache-Control": "private, max-age=31536000, immutable"},
+        )
+
+    except (FileNotFoundError, ValueError) as e:
+        raise HTTPException(status_code=404, detail=f"Tile not found: {e}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Could not render tile: {e}")
+
+
 @router.get("/download/{result_id}", tags=["pdf"])
-async def download_pdf(result_id: str):
+def download_pdf(result_id: str):
     """Download the created PDF by result ID."""
     try:
+        storage = get_storage()
         # Find the file with the result_id prefix
-        matching_files = list(OUTPUT_DIR.glob(f"{result_id}_*"))
+        file_info = storage.find(OUTPUT, f"{result_id}_")
 
-        if not matching_files:
+        if not file_info:
             raise HTTPException(status_code=404, detail="PDF not found")
 
-        file_path = matching_files[0]
+        filename = file_info["name"]
+
+        if isinstance(storage, LocalStorage):
+            # Local files need no pinning, so the path outlives the context
+            with storage.local_copy(OUTPUT, filename) as file_path:
+                return FileResponse(
+                    path=file_path,
+                    media_type="application/pdf",
+                    filename=filename,
+                )
 
-        return FileResponse(
-            path=file_path,
+        return StreamingResponse(
+            storage.iter_chunks(OUTPUT, filename),
             media_type="application/pdf",
-            filename=file_path.name,
+            headers={
+                "Content-Disposition": f'attachment; filename="{filename}"',
+                "Content-Length": str(file_info["size"]),
+            },
         )
 
     except HTTPException:
@@ -147,23 +382,21 @@ async def download_pdf(result_id: str):
 
 
 @router.get("/result/{result_id}", tags=["pdf"])
-async def get_pdf_result(result_id: str):
+def get_pdf_result(result_id: str):
     """Get information about the created PDF."""
     try:
+        storage = get_storage()
         # Find the file with the result_id prefix
-        matching_files = list(OUTPUT_DIR.glob(f"{result_id}_*"))
+        file_info = storage.find(OUTPUT, f"{result_id}_")
 
-        if not matching_files:
+        if not file_info:
             raise HTTPException(status_code=404, detail="PDF not found")
 
-        file_path = matching_files[0]
-        file_stats = file_path.stat()
-
         return {
             "result_id": result_id,
-            "filename": file_path.name,
-            "file_size": file_stats.st_size,
-            "created_at": file_stats.st_ctime,
+            "filename": file_info["name"],
+            "file_size": file_info["size"],
+            "created_at": file_info["modified"],
             "download_url": f"/api/download/{result_id}",
         }
 
@@ -178,7 +411,9 @@ async def get_pdf_result(result_id: str):
 async def get_cleanup_stats(_: bool = RequireAdminKey):
     """Get statistics about files in upload and output directories."""
     try:
-        cleanup_service = CleanupService(UPLOAD_DIR, OUTPUT_DIR)
+        cleanup_service = CleanupService(
+            get_storage(), get_search_index(), get_tile_cache()
+        )
         stats = cleanup_service.get_directory_stats()
         return {
             "message": "File statistics retrieved successfully",
@@ -192,7 +427,9 @@ async def get_cleanup_stats(_: bool = RequireAdminKey):
 async def cleanup_old_files(max_age_hours: int = 48, _: bool = RequireAdminKey):
     """Manually trigger cleanup of files older than specified hours."""
     try:
-        cleanup_service = CleanupService(UPLOAD_DIR, OUTPUT_DIR)
+        cleanup_service = CleanupService(
+            get_storage(), get_search_index(), get_tile_cache()
+        )
         cleaned_count = await cleanup_service.cleanup_old_files(max_age_hours)
         return {
             "message": f"Cleanup completed successfully",
@@ -207,7 +444,9 @@ async def cleanup_old_files(max_age_hours: int = 48, _: bool = RequireAdminKey):
 async def cleanup_all_files(_: bool = RequireAdminKey):
     """Remove all files from upload and output directories. Use with caution!"""
     try:
-        cleanup_service = CleanupService(UPLOAD_DIR, OUTPUT_DIR)
+        cleanup_service = CleanupService(
+            get_storage(), get_search_index(), get_tile_cache()
+        )
         total_removed = await cleanup_service.cleanup_all_files()
         return {
             "message": "All files removed successfully",
@@ -1,7 +1,7 @@
 from pydantic import BaseModel
 from functools import lru_cache
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 import os
 
 
@@ -15,6 +15,33 @@ class Settings(BaseModel):
     uploads_dir: Path = Path("uploads")
     output_dir: Path = Path("output")
 
+    # Storage backend: "local" or "s3"
+    storage_backend: str = os.getenv("STORAGE_BACKEND", "local")
+    s3_bucket: str = os.getenv("S3_BUCKET", "pdftoolkit")
+    s3_prefix: str = os.getenv("S3_PREFIX", "")
+    s3_endpoint_url: Optional[str] = os.getenv("S3_ENDPOINT_URL") or None
+    s3_region: Optional[str] = os.getenv("S3_REGION") or None
+    s3_multipart_threshold_mb: int = int(os.getenv("S3_MULTIPART_THRESHOLD_MB", "16"))
+    # Local read-through cache for remote storage
+    storage_cache_dir: Path = Path(os.getenv("STORAGE_CACHE_DIR", "storage_cache"))
+    storage_cache_max_mb: int = int(os.getenv("STORAGE_CACHE_MAX_MB", "1024"))
+
+    # Import PDF libraries in the background at startup
+    prewarm_imports: bool = os.getenv("PREWARM_IMPORTS", "true").lower() == "true"
+
+    # Rendered preview tile cache
+    tile_cache_max_mb: int = int(os.getenv("TILE_CACHE_MAX_MB", "128"))
+
+    # Worker pool size for CPU-bound PDF work
+    pdf_workers: int = int(os.getenv("PDF_WORKERS", str(os.cpu_count() or 2)))
+
+    # Full-text page index (SQLite FTS5)
+    search_index_path: Path = Path(os.getenv("SEARCH_INDEX_PATH", "search_index.db"))
+    # How often a node indexes uploads stored by other nodes; 0 disables
+    search_sync_interval_seconds: int = int(
+        os.getenv("SEARCH_SYNC_INTERVAL_SECONDS", "60")
+    )
+
     # Cleanup settings
     cleanup_enabled: bool = True
     cleanup_interval_minutes: int = int(
@@ -1,10 +1,15 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 from .api.routes import router as api_router
 from .core.config import get_settings
 from .services.cleanup_service import CleanupService
+from .services.pdf_service import PDFService
+from .services.search_service import get_search_index
+from .services.storage_service import get_storage
+from .services.tile_cache import get_tile_cache
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -15,27 +20,67 @@ settings = get_settings()
 # Global cleanup service instance
 cleanup_service = None
 
+# Background import of the PDF libraries
+prewarm_task = None
+
+# Background indexing of uploads stored by other nodes
+search_sync_task = None
+
+
+async def search_sync_loop(interval_seconds: int):
+    """Sync the search index with shared storage, starting right away."""
+    failed = {}
+    while True:
+        try:
+            added = await asyncio.to_thread(
+                PDFService.sync_search_index,
+                get_storage(),
+                get_search_index(),
+                failed,
+            )
+            if added:
+                logger.info(f"Indexed {added} uploads from shared storage")
+        except asyncio.CancelledError:
+            break
+        except Exception as e:
+            logger.error(f"Error in search sync loop: {e}")
+        try:
+            await asyncio.sleep(interval_seconds)
+        except asyncio.CancelledError:
+            break
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager."""
-    global cleanup_service
+    global cleanup_service, prewarm_task, search_sync_task
 
     # Startup
     logger.info("Starting PDFToolkit API...")
 
-    # Ensure directories exist
-    settings.uploads_dir.mkdir(exist_ok=True)
-    settings.output_dir.mkdir(exist_ok=True)
+    # Load PyMuPDF and Pillow off the event loop so startup isn't blocked
+    if settings.prewarm_imports:
+        prewarm_task = asyncio.create_task(asyncio.to_thread(PDFService.prewarm))
+
+    # Ensure storage is ready (directories, cache)
+    storage = get_storage()
+    storage.ensure_ready()
 
     # Initialize and start cleanup service
     if settings.cleanup_enabled:
-        cleanup_service = CleanupService(settings.uploads_dir, settings.output_dir)
+        cleanup_service = CleanupService(
+            storage, get_search_index(), get_tile_cache()
+        )
         await cleanup_service.start_cleanup_scheduler(
             settings.cleanup_interval_minutes, settings.max_file_age_minutes
         )
         logger.info("Cleanup service started")
 
+    if settings.search_sync_interval_seconds > 0:
+        search_sync_task = asyncio.create_task(
+            search_sync_loop(settings.search_sync_interval_seconds)
+        )
+
     yield
 
     # Shutdown
@@ -43,6 +88,12 @@ async def lifespan(app: FastAPI):
     if cleanup_service:
         await cleanup_service.stop_cleanup_scheduler()
         logger.info("Cleanup service stopped")
+    if search_sync_task:
+        search_sync_task.cancel()
+        await asyncio.gather(search_sync_task, return_exceptions=True)
+    if prewarm_task:
+        await prewarm_task
+    PDFService.shutdown_workers()
 
 
 app = FastAPI(
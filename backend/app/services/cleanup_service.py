@@ -3,8 +3,10 @@
 import asyncio
 import logging
 from datetime import datetime, timedelta
-from pathlib import Path
 from typing import Optional
+from .search_service import SearchIndex
+from .storage_service import StorageBackend, UPLOADS, OUTPUT
+from .tile_cache import TileCache
 
 logger = logging.getLogger(__name__)
 
@@ -12,9 +14,15 @@ logger = logging.getLogger(__name__)
 class CleanupService:
     """Service for cleaning up temporary files."""
 
-    def __init__(self, uploads_dir: Path, output_dir: Path):
-        self.uploads_dir = uploads_dir
-        self.output_dir = output_dir
+    def __init__(
+        self,
+        storage: StorageBackend,
+        search_index: Optional[SearchIndex] = None,
+        tile_cache: Optional[TileCache] = None,
+    ):
+        self.storage = storage
+        self.search_index = search_index
+        self.tile_cache = tile_cache
         self._cleanup_task: Optional[asyncio.Task] = None
 
     async def start_cleanup_scheduler(
@@ -71,11 +79,11 @@ class CleanupService:
         """
         cutoff_time = datetime.now() - timedelta(minutes=max_age_minutes)
 
-        # Clean uploads directory
-        cleaned_uploads = await self._clean_directory(self.uploads_dir, cutoff_time)
+        # Clean uploads
+        cleaned_uploads = await self._clean_area(UPLOADS, cutoff_time)
 
-        # Clean output directory
-        cleaned_output = await self._clean_directory(self.output_dir, cutoff_time)
+        # Clean outputs
+        cleaned_output = await self._clean_area(OUTPUT, cutoff_time)
 
         total_cleaned = cleaned_uploads + cleaned_output
 
@@ -87,36 +95,32 @@ class CleanupService:
 
         return total_cleaned
 
-    async def _clean_directory(self, directory: Path, cutoff_time: datetime) -> int:
-        """Clean a specific directory."""
-        if not directory.exists():
-            return 0
-
+    async def _clean_area(self, area: str, cutoff_time: datetime) -> int:
+        """Clean a specific storage area."""
         cleaned_count = 0
 
         try:
-            for file_path in directory.iterdir():
-                if file_path.is_file():
-                    # Get file modification time
-                    file_mtime = datetime.fromtimestamp(file_path.stat().st_mtime)
-
-                    if file_mtime < cutoff_time:
-                        try:
-                            file_path.unlink()
-                            cleaned_count += 1
-                            logger.debug(f"Removed old file: {file_path.name}")
-                        except Exception as e:
-                            logger.error(f"Failed to remove {file_path}: {e}")
+            for file_info in self.storage.list_files(area):
+                # Get file modification time
+                file_mtime = datetime.fromtimestamp(file_info["modified"])
+
+                if file_mtime < cutoff_time:
+                    try:
+                        self._remove(area, file_info["name"])
+                        cleaned_count += 1
+                        logger.debug(f"Removed old file: {file_info['name']}")
+                    except Exception as e:
+                        logger.error(f"Failed to remove {file_info['name']}: {e}")
 
         except Exception as e:
-            logger.error(f"Error cleaning directory {directory}: {e}")
+            logger.error(f"Error cleaning {area}: {e}")
 
         return cleaned_count
 
     async def cleanup_all_files(self):
-        """Remove all files from both directories (use with caution)."""
-        uploads_count = await self._clean_all_in_directory(self.uploads_dir)
-        output_count = await self._clean_all_in_directory(self.output_dir)
+        """Remove all files from both areas (use with caution)."""
+        uploads_count = await self._clean_all_in_area(UPLOADS)
+        output_count = await self._clean_all_in_area(OUTPUT)
 
         total = uploads_count + output_count
         logger.info(
@@ -126,48 +130,58 @@ class CleanupService:
 
         return total
 
-    async def _clean_all_in_directory(self, directory: Path) -> int:
-        """Remove all files from a directory."""
-        if not directory.exists():
-            return 0
-
+    async def _clean_all_in_area(self, area: str) -> int:
+        """Remove all files from a storage area."""
         count = 0
-        for file_path in directory.iterdir():
-            if file_path.is_file():
-                try:
-                    file_path.unlink()
-                    count += 1
-                except Exception as e:
-                    logger.error(f"Failed to remove {file_path}: {e}")
+        for file_info in self.storage.list_files(area):
+            try:
+                self._remove(area, file_info["name"])
+                count += 1
+            except Exception as e:
+                logger.error(f"Failed to remove {file_info['name']}: {e}")
 
         return count
 
-    def get_directory_stats(self) -> dict:
-        """Get statistics about both directories."""
+    def _remove(self, area: str, name: str):
+        """Delete a file and drop indexed text and tiles of deleted uploads."""
+        self.storage.delete(area, name)
 
-        def get_dir_stats(directory: Path) -> dict:
-            if not directory.exists():
-                return {"file_count": 0, "total_size": 0, "oldest_file": None}
+        if area != UPLOADS:
+            return
+
+        if self.tile_cache is not None:
+            self.tile_cache.invalidate(name)
+
+        if self.search_index is None:
+            return
+
+        try:
+            self.search_index.remove_document(name)
+        except Exception as e:
+            logger.error(f"Failed to remove {name} from search index: {e}")
+
+    def get_directory_stats(self) -> dict:
+        """Get statistics about both storage areas."""
 
-            files = list(directory.iterdir())
-            files = [f for f in files if f.is_file()]
+        def get_area_stats(area: str) -> dict:
+            files = self.storage.list_files(area)
 
             if not files:
                 return {"file_count": 0, "total_size": 0, "oldest_file": None}
 
-            total_size = sum(f.stat().st_size for f in files)
-            oldest_file = min(files, key=lambda f: f.stat().st_mtime)
-            oldest_time = datetime.fromtimestamp(oldest_file.stat().st_mtime)
+            total_size = sum(f["size"] for f in files)
+            oldest_file = min(files, key=lambda f: f["modified"])
+            oldest_time = datetime.fromtimestamp(oldest_file["modified"])
 
             return {
                 "file_count": len(files),
                 "total_size": total_size,
-                "oldest_file": oldest_file.name,
+                "oldest_file": oldest_file["name"],
                 "oldest_file_age": (datetime.now() - oldest_time).total_seconds()
                 / 60,  # minutes
             }
 
         return {
-            "uploads": get_dir_stats(self.uploads_dir),
-            "output": get_dir_stats(self.output_dir),
+            "uploads": get_area_stats(UPLOADS),
+            "output": get_area_stats(OUTPUT),
         }
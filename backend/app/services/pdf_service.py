@@ -1,29 +1,231 @@
 """PDF processing service for page extraction and manipulation."""
 
 import base64
+import math
+import multiprocessing
+import threading
+import zipfile
+from contextlib import ExitStack
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import List, Dict, Any
-import fitz  # PyMuPDF
-from PIL import Image
+from typing import List, Dict, Any, Iterator, Optional, Tuple, TYPE_CHECKING
 import io
+import logging
+import os
+import tempfile
+from .search_service import SearchIndex
+from .storage_service import StorageBackend, UPLOADS
+
+# PyMuPDF and Pillow are imported where they are used so that importing the
+# app stays fast; PDFService.prewarm() loads them ahead of the first request.
+if TYPE_CHECKING:
+    import fitz  # PyMuPDF
+
+logger = logging.getLogger(__name__)
+
+# Images smaller than this are not worth recompressing
+MIN_OPTIMIZE_IMAGE_BYTES = 32 * 1024
+
+# Edge length of preview tiles in pixels
+TILE_SIZE = 256
+# Deepest zoom level renders at this scale (8 = 576 dpi)
+MAX_TILE_SCALE = 8
+
+
+# File extensions for exported page images
+EXPORT_EXTENSIONS = {"png": "png", "jpeg": "jpg", "webp": "webp"}
+# Largest exported page image in pixels (A4 at 600 dpi is ~35 megapixels);
+# larger pages are rendered at a lower resolution
+MAX_EXPORT_PIXELS = 64_000_000
+
+# Shared process pool for page rasterization, created on first export
+_render_pool: Optional[ProcessPoolExecutor] = None
+_render_pool_lock = threading.Lock()
+
+
+def _get_render_pool(max_workers: Optional[int]) -> ProcessPoolExecutor:
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None:
+            # Spawn rather than fork: the server process runs threads
+            _render_pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _render_pool
+
+
+def _discard_render_pool(pool: ProcessPoolExecutor):
+    """Replace a broken pool, unless another export already did."""
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is pool:
+            _render_pool = None
+    # Its futures have all failed already; nothing else to cancel
+    pool.shutdown(wait=False)
+
+
+def _render_page_image(
+    pdf_path: str,
+    page_number: int,
+    rotation: Optional[int],
+    dpi: int,
+    image_format: str,
+    quality: int,
+) -> bytes:
+    """
+    Rasterize one page. Runs in a worker process.
+
+    Args:
+        pdf_path: Path to the PDF file
+        page_number: 1-based page number
+        rotation: Rotation to apply, or None to keep the page's own
+        dpi: Output resolution, lowered if the image would exceed
+            MAX_EXPORT_PIXELS
+        image_format: One of EXPORT_EXTENSIONS
+        quality: Quality for lossy formats
+    """
+    import fitz  # PyMuPDF
+
+    doc = fitz.open(pdf_path)
+    try:
+        page = doc[page_number - 1]
+        if rotation is not None:
+            page.set_rotation(rotation)
+
+        # A large-format page at high dpi would need a pixmap of many GB
+        square_inches = page.rect.width * page.rect.height / 72**2
+        if square_inches * dpi**2 > MAX_EXPORT_PIXELS:
+            dpi = max(1, int(math.sqrt(MAX_EXPORT_PIXELS / square_inches)))
+
+        pix = page.get_pixmap(dpi=dpi)
+        if image_format == "png":
+            return pix.tobytes("png")
+        return pix.pil_tobytes(format=image_format.upper(), quality=quality)
+    finally:
+        doc.close()
+
+
+class _ZipStream:
+    """Write-only sink that lets zipfile output be streamed in pieces."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _tile_levels(page_rect: "fitz.Rect", tile_size: int) -> List[Dict[str, Any]]:
+    """
+    Describe the zoom levels of a page's tile pyramid.
+
+    Level 0 fits the whole page in one tile; each level doubles the scale
+    until MAX_TILE_SCALE is reached.
+    """
+    base_scale = tile_size / max(page_rect.width, page_rect.height)
+    level_count = max(1, math.ceil(math.log2(MAX_TILE_SCALE / base_scale)) + 1)
+
+    levels = []
+    for zoom in range(level_count):
+        scale = base_scale * 2**zoom
+        width = math.ceil(page_rect.width * scale)
+        height = math.ceil(page_rect.height * scale)
+        levels.append(
+            {
+                "zoom": zoom,
+                "scale": scale,
+                "width": width,
+                "height": height,
+                "columns": math.ceil(width / tile_size),
+                "rows": math.ceil(height / tile_size),
+            }
+        )
+    return levels
+
+
+def _recompress_image(
+    image_bytes: bytes, scale: float, jpeg_quality: int
+) -> Optional[bytes]:
+    """
+    Downsample and JPEG-encode one embedded image.
+
+    Runs in a worker thread; Pillow releases the GIL while decoding,
+    resampling and encoding.
+
+    Returns:
+        The new image bytes, or None if the image should be left as is
+    """
+    from PIL import Image
+
+    try:
+        img = Image.open(io.BytesIO(image_bytes))
+        # CMYK, palette and bilevel images do not survive JPEG well
+        if img.mode not in ("RGB", "L"):
+            return None
+
+        if scale < 1:
+            new_size = (
+                max(1, round(img.width * scale)),
+                max(1, round(img.height * scale)),
+            )
+            img = img.resize(new_size, Image.Resampling.LANCZOS)
+
+        buffer = io.BytesIO()
+        img.save(buffer, format="JPEG", quality=jpeg_quality, optimize=True)
+    except Exception:
+        return None
+
+    data = buffer.getvalue()
+    return data if len(data) < len(image_bytes) else None
 
 
 class PDFService:
     """Service for PDF processing operations."""
 
     @staticmethod
-    def extract_pages(pdf_path: Path) -> List[Dict[str, Any]]:
+    def prewarm():
+        """Import the heavy PDF and imaging libraries."""
+        import fitz  # noqa: F401
+        from PIL import Image  # noqa: F401
+
+    @staticmethod
+    def extract_pages(
+        pdf_path: Path, search_index: Optional[SearchIndex] = None
+    ) -> List[Dict[str, Any]]:
         """
         Extract pages from a PDF and convert them to images.
 
         Args:
             pdf_path: Path to the PDF file
+            search_index: If given, page text is extracted in the same pass
+                and indexed under the PDF's filename
 
         Returns:
             List of dictionaries containing page information and base64-encoded
             images
         """
+        import fitz  # PyMuPDF
+        from PIL import Image
+
         pages = []
+        page_texts = []
 
         try:
             # Open the PDF document
@@ -32,6 +234,9 @@ class PDFService:
             for page_num in range(doc.page_count):
                 page = doc[page_num]
 
+                if search_index is not None:
+                    page_texts.append(page.get_text())
+
                 # Convert page to image
                 mat = fitz.Matrix(2, 2)  # Scale factor for better quality
                 pix = page.get_pixmap(matrix=mat)
@@ -60,11 +265,93 @@ class PDFService:
 
             doc.close()
 
+            if search_index is not None:
+                search_index.index_document(pdf_path.name, page_texts)
+
         except Exception as e:
             raise Exception(f"Failed to process PDF: {str(e)}")
 
         return pages
 
+    @staticmethod
+    def extract_text(pdf_path: Path) -> List[str]:
+        """
+        Extract the text of each page without rendering.
+
+        Args:
+            pdf_path: Path to the PDF file
+
+        Returns:
+            Text of each page, in page order
+        """
+        import fitz  # PyMuPDF
+
+        try:
+            doc = fitz.open(pdf_path)
+            texts = [page.get_text() for page in doc]
+            doc.close()
+            return texts
+        except Exception as e:
+            raise Exception(f"Failed to extract text: {str(e)}")
+
+    @staticmethod
+    def sync_search_index(
+        storage: StorageBackend,
+        search_index: SearchIndex,
+        failed: Optional[Dict[str, float]] = None,
+    ) -> int:
+        """
+        Bring a node's search index in line with shared storage.
+
+        Uploads stored by other nodes are indexed, and rows of uploads that
+        no longer exist are removed.
+
+        Args:
+            storage: Storage holding the uploaded PDFs
+            search_index: Index to update
+            failed: Uploads that could not be indexed, mapped to their
+                modification time; updated in place. They are skipped
+                until they are replaced.
+
+        Returns:
+            Number of documents indexed
+        """
+        if failed is None:
+            failed = {}
+        stored = {
+            file_info["name"]: file_info["modified"]
+            for file_info in storage.list_files(UPLOADS)
+        }
+        indexed = search_index.indexed_documents()
+
+        for name in indexed - stored.keys():
+            search_index.remove_document(name)
+        for name in failed.keys() - stored.keys():
+            del failed[name]
+
+        added = 0
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            pdf_path = Path(tmp_dir) / "source.pdf"
+            for name, modified in stored.items():
+                if name in indexed or failed.get(name) == modified:
+                    continue
+                try:
+                    # Stream past the read-through cache so a sync doesn't
+                    # evict the sources requests are working on
+                    with pdf_path.open("wb") as buffer:
+                        for chunk in storage.iter_chunks(UPLOADS, name):
+                            buffer.write(chunk)
+                    search_index.index_document(
+                        name, PDFService.extract_text(pdf_path)
+                    )
+                    failed.pop(name, None)
+                    added += 1
+                except Exception as e:
+                    failed[name] = modified
+                    logger.error(f"Failed to index {name}: {e}")
+
+        return added
+
     @staticmethod
     def get_pdf_info(pdf_path: Path) -> Dict[str, Any]:
         """
@@ -76,6 +363,8 @@ class PDFService:
         Returns:
             Dictionary containing PDF metadata
         """
+        import fitz  # PyMuPDF
+
         try:
             doc = fitz.open(pdf_path)
             info = {
@@ -90,7 +379,10 @@ class PDFService:
 
     @staticmethod
     def create_pdf_from_pages(
-        page_order: List[Dict[str, Any]], output_path: Path, uploads_dir: Path
+        page_order: List[Dict[str, Any]],
+        output_path: Path,
+        storage: StorageBackend,
+        optimize: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """
         Create a new PDF from reordered pages.
@@ -98,56 +390,412 @@ class PDFService:
         Args:
             page_order: List of page info with source PDF and page number
             output_path: Path where the new PDF will be saved
-            uploads_dir: Directory containing source PDFs
+            storage: Storage holding the source PDFs
+            optimize: Optional image optimization settings with target_dpi,
+                jpeg_quality and max_workers
 
         Returns:
             Dictionary containing creation result information
         """
+        import fitz  # PyMuPDF
+
         try:
             # Create new PDF document
             new_doc = fitz.open()
 
-            for page_info in page_order:
-                source_filename = page_info.get("source_pdf")
-                # Convert to 0-based index
-                page_number = page_info.get("page_number", 1) - 1
-                rotation = page_info.get("rotation", 0)
-
-                source_path = uploads_dir / source_filename
-                if not source_path.exists():
-                    raise Exception(f"Source PDF not found: {source_filename}")
+            # Resolve each source once; remote storage may fetch it. The
+            # copies stay pinned until every page has been inserted.
+            source_paths: Dict[str, Path] = {}
+
+            with ExitStack() as pinned_sources:
+                for page_info in page_order:
+                    source_filename = page_info.get("source_pdf")
+                    # Convert to 0-based index
+                    page_number = page_info.get("page_number", 1) - 1
+                    rotation = page_info.get("rotation", 0)
+
+                    source_path = source_paths.get(source_filename)
+                    if source_path is None:
+                        try:
+                            source_path = pinned_sources.enter_context(
+                                storage.local_copy(UPLOADS, source_filename)
+                            )
+                        except FileNotFoundError:
+                            raise Exception(
+                                f"Source PDF not found: {source_filename}"
+                            )
+                        source_paths[source_filename] = source_path
+
+                    # Open source document
+                    source_doc = fitz.open(source_path)
+
+                    if page_number >= source_doc.page_count:
+                        source_doc.close()
+                        raise Exception(
+                            f"Page {page_number + 1} not found in " f"{source_filename}"
+                        )
+
+                    # Insert the page into the new document
+                    new_doc.insert_pdf(
+                        source_doc, from_page=page_number, to_page=page_number
+                    )
 
-                # Open source document
-                source_doc = fitz.open(source_path)
+                    # Get the newly inserted page and apply rotation if needed
+                    if rotation != 0:
+                        new_page = new_doc[-1]  # Get the last inserted page
+                        new_page.set_rotation(rotation)
 
-                if page_number >= source_doc.page_count:
                     source_doc.close()
-                    raise Exception(
-                        f"Page {page_number + 1} not found in " f"{source_filename}"
-                    )
 
-                # Insert the page into the new document
-                new_doc.insert_pdf(
-                    source_doc, from_page=page_number, to_page=page_number
+            save_options = {}
+            optimization = {"images_optimized": 0, "bytes_saved": 0}
+            if optimize is not None:
+                # Compact streams so the saving is measured against a
+                # compacted original
+                save_options = {"garbage": 3, "deflate": True}
+                optimization = PDFService.optimize_images(
+                    new_doc,
+                    target_dpi=optimize.get("target_dpi", 150),
+                    jpeg_quality=optimize.get("jpeg_quality", 75),
+                    max_workers=optimize.get("max_workers"),
                 )
 
-                # Get the newly inserted page and apply rotation if needed
-                if rotation != 0:
-                    new_page = new_doc[-1]  # Get the last inserted page
-                    new_page.set_rotation(rotation)
-
-                source_doc.close()
-
             # Save the new PDF
-            new_doc.save(output_path)
+            new_doc.save(output_path, **save_options)
             new_doc.close()
 
+            file_size = output_path.stat().st_size
             return {
                 "filename": output_path.name,
                 "page_count": len(page_order),
                 "file_path": str(output_path),
-                "file_size": output_path.stat().st_size,
+                "file_size": file_size,
+                # The document as saved, had its images been left alone
+                "original_size": file_size + optimization["bytes_saved"],
+                "images_optimized": optimization["images_optimized"],
             }
 
         except Exception as e:
             raise Exception(f"Failed to create PDF: {str(e)}")
+
+    @staticmethod
+    def optimize_images(
+        doc: "fitz.Document",
+        target_dpi: int = 150,
+        jpeg_quality: int = 75,
+        max_workers: Optional[int] = None,
+    ) -> Dict[str, int]:
+        """
+        Downsample and recompress embedded images in place.
+
+        Images already at or below the target resolution, or too small to
+        matter, are skipped. Recompression runs in a thread pool; reading
+        and replacing images stays on the calling thread because fitz
+        documents are not thread-safe. Only a small window of images is
+        extracted at once, so memory stays bounded regardless of the
+        number of images.
+
+        Args:
+            doc: Open PDF document to modify
+            target_dpi: Resolution to downsample images to
+            jpeg_quality: JPEG quality (1-95) for recompressed images
+            max_workers: Size of the worker pool
+
+        Returns:
+            Dictionary with the number of images replaced and the bytes
+            saved on their streams
+        """
+        # Highest-resolution placement decides how far each image can shrink
+        candidates: Dict[int, Dict[str, Any]] = {}
+        for page in doc:
+            for info in page.get_image_info(xrefs=True):
+                xref = info.get("xref", 0)
+                if xref <= 0 or not info["width"]:
+                    continue
+
+                a, b, c, d, _, _ = info["transform"]
+                # Displayed size in inches (72 points per inch)
+                shown_width = math.hypot(a, b) / 72
+                shown_height = math.hypot(c, d) / 72
+                if shown_width <= 0 or shown_height <= 0:
+                    continue
+
+                dpi = min(
+                    info["width"] / shown_width, info["height"] / shown_height
+                )
+                scale = target_dpi / dpi
+                candidate = candidates.get(xref)
+                if candidate is None or scale > candidate["scale"]:
+                    candidates[xref] = {"page": page.number, "scale": scale}
+
+        def extract_next():
+            """Extract the next image worth recompressing, lazily."""
+            for xref, candidate in candidates.items():
+                if candidate["scale"] >= 1:
+                    continue
+                image = doc.extract_image(xref)
+                if not image or image.get("smask"):
+                    continue
+                if len(image["image"]) < MIN_OPTIMIZE_IMAGE_BYTES:
+                    continue
+                yield xref, candidate["page"], image["image"], candidate["scale"]
+
+        remaining = extract_next()
+        window = 2 * (max_workers or os.cpu_count() or 1)
+        pending: Dict[Future, Tuple[int, int]] = {}
+        replaced = 0
+        bytes_saved = 0
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+
+            def submit_next():
+                job = next(remaining, None)
+                if job is None:
+                    return
+                xref, page_number, image_bytes, scale = job
+                future = executor.submit(
+                    _recompress_image, image_bytes, scale, jpeg_quality
+                )
+                pending[future] = (xref, page_number)
+
+            for _ in range(window):
+                submit_next()
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    xref, page_number = pending.pop(future)
+                    data = future.result()
+                    submit_next()
+                    if data is None:
+                        continue
+                    old_size = len(doc.xref_stream_raw(xref))
+                    doc[page_number].replace_image(xref, stream=data)
+                    replaced += 1
+                    bytes_saved += old_size - len(data)
+
+        return {"images_optimized": replaced, "bytes_saved": bytes_saved}
+
+    @staticmethod
+    def get_tile_pyramid(
+        pdf_path: Path, page_number: int, tile_size: int = TILE_SIZE
+    ) -> Dict[str, Any]:
+        """
+        Describe the tile pyramid of a page.
+
+        Args:
+            pdf_path: Path to the PDF file
+            page_number: 1-based page number
+            tile_size: Tile edge length in pixels
+
+        Returns:
+            Dictionary with the page size in points and the zoom levels
+
+        Raises:
+            ValueError: If the page does not exist
+        """
+        import fitz  # PyMuPDF
+
+        doc = fitz.open(pdf_path)
+        try:
+            if not 1 <= page_number <= doc.page_count:
+                raise ValueError(f"Page {page_number} not found in {pdf_path.name}")
+            page_rect = doc[page_number - 1].rect
+        finally:
+            doc.close()
+
+        return {
+            "page_number": page_number,
+            "width": page_rect.width,
+            "height": page_rect.height,
+            "tile_size": tile_size,
+            "levels": _tile_levels(page_rect, tile_size),
+        }
+
+    @staticmethod
+    def render_tile(
+        pdf_path: Path,
+        page_number: int,
+        zoom: int,
+        x: int,
+        y: int,
+        tile_size: int = TILE_SIZE,
+    ) -> bytes:
+        """
+        Render one tile of a page as PNG.
+
+        Only the tile's clip rectangle is rasterized, so the cost depends on
+        the tile size rather than the page size at that zoom level.
+
+        Args:
+            pdf_path: Path to the PDF file
+            page_number: 1-based page number
+            zoom: Pyramid level, 0 being the whole page in one tile
+            x: Tile column
+            y: Tile row
+            tile_size: Tile edge length in pixels
+
+        Returns:
+            PNG image bytes
+
+        Raises:
+            ValueError: If the page, zoom level or tile does not exist
+        """
+        import fitz  # PyMuPDF
+
+        doc = fitz.open(pdf_path)
+        try:
+            if not 1 <= page_number <= doc.page_count:
+                raise ValueError(f"Page {page_number} not found in {pdf_path.name}")
+            page = doc[page_number - 1]
+
+            levels = _tile_levels(page.rect, tile_size)
+            if not 0 <= zoom < len(levels):
+                raise ValueError(f"Zoom level {zoom} out of range")
+            level = levels[zoom]
+            if not (0 <= x < level["columns"] and 0 <= y < level["rows"]):
+                raise ValueError(f"Tile {x},{y} out of range at zoom {zoom}")
+
+            # Tile bounds in page coordinates, clipped to the page edge
+            scale = level["scale"]
+            span = tile_size / scale
+            clip = fitz.Rect(x * span, y * span, (x + 1) * span, (y + 1) * span)
+            clip &= page.rect
+
+            pix = page.get_pixmap(matrix=fitz.Matrix(scale, scale), clip=clip)
+            return pix.tobytes("png")
+        finally:
+            doc.close()
+
+    @staticmethod
+    def parse_page_ranges(spec: Optional[str], page_count: int) -> List[int]:
+        """
+        Parse a page range spec such as "1-3,7,10-".
+
+        Args:
+            spec: Comma-separated 1-based pages or ranges; empty means all
+            page_count: Number of pages available
+
+        Returns:
+            Selected page numbers in the order given
+
+        Raises:
+            ValueError: If the spec is malformed or out of range
+        """
+        if not spec or not spec.strip():
+            return list(range(1, page_count + 1))
+
+        pages = []
+        for part in spec.split(","):
+            part = part.strip()
+            try:
+                if "-" in part:
+                    start_text, end_text = part.split("-", 1)
+                    start = int(start_text) if start_text.strip() else 1
+                    end = int(end_text) if end_text.strip() else page_count
+                else:
+                    start = end = int(part)
+            except ValueError:
+                raise ValueError(f"Invalid page range: {part!r}")
+
+            if not 1 <= start <= end <= page_count:
+                raise ValueError(f"Page range {part!r} outside 1-{page_count}")
+            pages.extend(range(start, end + 1))
+
+        return pages
+
+    @staticmethod
+    def export_page_images(
+        jobs: List[Dict[str, Any]],
+        image_format: str = "png",
+        dpi: int = 150,
+        quality: int = 85,
+        max_workers: Optional[int] = None,
+    ) -> Iterator[bytes]:
+        """
+        Rasterize pages in worker processes and stream them as a ZIP.
+
+        Images are added to the archive as they finish. Only a small window
+        of pages is in flight at once, so memory stays bounded regardless
+        of the number of pages.
+
+        Args:
+            jobs: Pages to render, each with pdf_path, page_number and
+                optional rotation
+            image_format: png, jpeg or webp
+            dpi: Output resolution
+            quality: Quality for jpeg and webp
+            max_workers: Size of the worker process pool
+
+        Returns:
+            Iterator over chunks of the ZIP archive
+        """
+        extension = EXPORT_EXTENSIONS[image_format]
+        pool = _get_render_pool(max_workers)
+        window = 2 * (max_workers or os.cpu_count() or 1)
+
+        remaining = iter(enumerate(jobs, start=1))
+        pending: Dict[Future, str] = {}
+
+        def submit_next():
+            item = next(remaining, None)
+            if item is None:
+                return
+
+            index, job = item
+            pdf_path = Path(job["pdf_path"])
+            page_number = job["page_number"]
+            future = pool.submit(
+                _render_page_image,
+                str(pdf_path),
+                page_number,
+                job.get("rotation"),
+                dpi,
+                image_format,
+                quality,
+            )
+            pending[future] = (
+                f"{index:04d}_{pdf_path.stem}_page{page_number}.{extension}"
+            )
+
+        sink = _ZipStream()
+        written = 0
+        try:
+            with zipfile.ZipFile(sink, "w", zipfile.ZIP_STORED) as archive:
+                for _ in range(window):
+                    submit_next()
+
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        name = pending.pop(future)
+                        archive.writestr(name, future.result())
+                        written += 1
+                        submit_next()
+                        yield sink.drain()
+
+            # Central directory, written when the archive is closed
+            yield sink.drain()
+        except Exception as e:
+            # Headers are already sent, so the client only sees the stream
+            # break off; make sure the failure is on record
+            logger.error(
+                f"Image export failed after {written} of {len(jobs)} pages: {e}"
+            )
+            if isinstance(e, BrokenProcessPool):
+                # A worker died; later exports get a fresh pool
+                _discard_render_pool(pool)
+            raise
+        finally:
+            # Client went away or a page failed; don't render the rest
+            for future in pending:
+                future.cancel()
+
+    @staticmethod
+    def shutdown_workers():
+        """Stop the page rasterization worker processes."""
+        global _render_pool
+        with _render_pool_lock:
+            pool, _render_pool = _render_pool, None
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
@@ -0,0 +1,211 @@
+"""Full-text page index backed by SQLite FTS5."""
+
+import logging
+import sqlite3
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Dict, Any, Callable, Iterable, Optional, Set, Tuple
+
+from ..core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Control characters used to mark highlights in snippets; they are stripped
+# from indexed text so they can't come from a document
+_HIGHLIGHT_START = "\x02"
+_HIGHLIGHT_END = "\x03"
+
+
+class SearchIndex:
+    """
+    Per-page text index keyed by source PDF and page number.
+
+    Each node keeps its own index. Nodes converge through periodic
+    background syncs against shared storage (see
+    PDFService.sync_search_index), and search hits are checked against
+    storage so deleted sources never show up.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection, creating the schema on first use."""
+        conn = sqlite3.connect(self.db_path)
+        if not self._schema_ready:
+            with self._schema_lock:
+                if not self._schema_ready:
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.execute(
+                        "CREATE VIRTUAL TABLE IF NOT EXISTS pages USING fts5("
+                        "source_pdf UNINDEXED, page_number UNINDEXED, text, "
+                        "tokenize='unicode61 remove_diacritics 2')"
+                    )
+                    conn.commit()
+                    self._schema_ready = True
+        return conn
+
+    def index_document(self, source_pdf: str, page_texts: Iterable[str]) -> int:
+        """
+        Replace the indexed pages of a document.
+
+        Args:
+            source_pdf: Filename of the uploaded PDF
+            page_texts: Extracted text of each page, in page order
+
+        Returns:
+            Number of pages indexed
+        """
+        rows = [
+            (source_pdf, page_number, _strip_markers(text))
+            for page_number, text in enumerate(page_texts, start=1)
+        ]
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM pages WHERE source_pdf = ?", (source_pdf,))
+                conn.executemany(
+                    "INSERT INTO pages (source_pdf, page_number, text) "
+                    "VALUES (?, ?, ?)",
+                    rows,
+                )
+        finally:
+            conn.close()
+        return len(rows)
+
+    def remove_document(self, source_pdf: str) -> int:
+        """Remove all indexed pages of a document."""
+        conn = self._connect()
+        try:
+            with conn:
+                cursor = conn.execute(
+                    "DELETE FROM pages WHERE source_pdf = ?", (source_pdf,)
+                )
+            return cursor.rowcount
+        finally:
+            conn.close()
+
+    def indexed_documents(self) -> Set[str]:
+        """Names of all documents with indexed pages."""
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT DISTINCT source_pdf FROM pages").fetchall()
+        finally:
+            conn.close()
+        return {source_pdf for (source_pdf,) in rows}
+
+    def clear(self) -> None:
+        """Remove every indexed page."""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM pages")
+        finally:
+            conn.close()
+
+    def search(
+        self,
+        query: str,
+        limit: int = 20,
+        source_exists: Optional[Callable[[str], bool]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Find pages matching all terms of a query.
+
+        Args:
+            query: Free text; each whitespace-separated term must match
+            limit: Maximum number of results
+            source_exists: If given, hits whose source no longer exists are
+                dropped and their rows removed from the index
+
+        Returns:
+            List of matches with source PDF, page number, a plain-text
+            snippet and the [start, end) offsets of matched terms in it,
+            best matches first
+        """
+        match = self._build_match_expression(query)
+        if not match:
+            return []
+
+        present: Set[str] = set()
+        while True:
+            results = self._query(match, limit)
+            if source_exists is None:
+                return results
+
+            sources = {result["source_pdf"] for result in results} - present
+            stale = {name for name in sources if not source_exists(name)}
+            present |= sources - stale
+            if not stale:
+                return results
+
+            # Removed rows free up room for more hits, so query again
+            for name in stale:
+                logger.info(f"Dropping search rows of deleted source {name}")
+                self.remove_document(name)
+
+    def _query(self, match: str, limit: int) -> List[Dict[str, Any]]:
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT source_pdf, page_number, "
+                "snippet(pages, 2, ?, ?, '…', 12) "
+                "FROM pages WHERE pages MATCH ? ORDER BY rank LIMIT ?",
+                (_HIGHLIGHT_START, _HIGHLIGHT_END, match, limit),
+            ).fetchall()
+        finally:
+            conn.close()
+
+        results = []
+        for source_pdf, page_number, marked in rows:
+            snippet, highlights = _split_highlights(marked)
+            results.append(
+                {
+                    "source_pdf": source_pdf,
+                    "page_number": page_number,
+                    "snippet": snippet,
+                    "highlights": highlights,
+                }
+            )
+        return results
+
+    @staticmethod
+    def _build_match_expression(query: str) -> str:
+        """Quote each term so user input cannot break FTS5 query syntax."""
+        terms = ['"' + term.replace('"', '""') + '"' for term in query.split()]
+        if not terms:
+            return ""
+        # Prefix-match the last term so results appear while typing
+        terms[-1] += "*"
+        return " ".join(terms)
+
+
+def _strip_markers(text: str) -> str:
+    return text.replace(_HIGHLIGHT_START, "").replace(_HIGHLIGHT_END, "")
+
+
+def _split_highlights(marked: str) -> Tuple[str, List[List[int]]]:
+    """Turn a marked-up snippet into plain text and highlight offsets."""
+    parts = []
+    highlights = []
+    length = 0
+    start = None
+    for char in marked:
+        if char == _HIGHLIGHT_START:
+            start = length
+        elif char == _HIGHLIGHT_END:
+            if start is not None:
+                highlights.append([start, length])
+            start = None
+        else:
+            parts.append(char)
+            length += 1
+    return "".join(parts), highlights
+
+
+@lru_cache
+def get_search_index() -> SearchIndex:
+    return SearchIndex(get_settings().search_index_path)
@@ -0,0 +1,412 @@
+"""Storage backends for uploaded sources and generated outputs."""
+
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Any
+
+from ..core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Storage areas; each maps to a directory (local) or key prefix (S3)
+UPLOADS = "uploads"
+OUTPUT = "output"
+AREAS = (UPLOADS, OUTPUT)
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class StorageBackend(ABC):
+    """Interface shared by all storage backends."""
+
+    def ensure_ready(self):
+        """Prepare the backend for use (create directories, etc.)."""
+
+    @abstractmethod
+    def save(self, area: str, name: str, fileobj: BinaryIO) -> int:
+        """Stream a file object into storage and return its size."""
+
+    @abstractmethod
+    def open(self, area: str, name: str) -> BinaryIO:
+        """Open a stored file for streaming reads."""
+
+    @abstractmethod
+    @contextmanager
+    def local_copy(self, area: str, name: str) -> Iterator[Path]:
+        """
+        Yield a local filesystem path for a stored file.
+
+        The path stays valid until the context exits.
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+        """
+
+    @abstractmethod
+    @contextmanager
+    def writable_path(self, area: str, name: str) -> Iterator[Path]:
+        """Yield a local path to write to; the file is stored on exit."""
+
+    @abstractmethod
+    def delete(self, area: str, name: str):
+        """Delete a stored file."""
+
+    @abstractmethod
+    def list_files(self, area: str) -> List[Dict[str, Any]]:
+        """List files in an area as dicts with name, size and modified."""
+
+    @abstractmethod
+    def exists(self, area: str, name: str) -> bool:
+        """Check whether a file is stored."""
+
+    @abstractmethod
+    def version(self, area: str, name: str) -> str:
+        """
+        Return a token that changes whenever a stored file's content does.
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+        """
+
+    def find(self, area: str, prefix: str) -> Optional[Dict[str, Any]]:
+        """Return the first file whose name starts with prefix."""
+        for file_info in self.list_files(area):
+            if file_info["name"].startswith(prefix):
+                return file_info
+        return None
+
+    def iter_chunks(
+        self, area: str, name: str, chunk_size: int = CHUNK_SIZE
+    ) -> Iterator[bytes]:
+        """Stream a stored file in chunks."""
+        with self.open(area, name) as stream:
+            while chunk := stream.read(chunk_size):
+                yield chunk
+
+
+class LocalStorage(StorageBackend):
+    """Storage on the local filesystem."""
+
+    def __init__(self, uploads_dir: Path, output_dir: Path):
+        self.directories = {UPLOADS: uploads_dir, OUTPUT: output_dir}
+
+    def _path(self, area: str, name: str) -> Path:
+        return self.directories[area] / Path(name).name
+
+    def ensure_ready(self):
+        for directory in self.directories.values():
+            directory.mkdir(parents=True, exist_ok=True)
+
+    def save(self, area: str, name: str, fileobj: BinaryIO) -> int:
+        path = self._path(area, name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("wb") as buffer:
+            shutil.copyfileobj(fileobj, buffer, CHUNK_SIZE)
+        return path.stat().st_size
+
+    def open(self, area: str, name: str) -> BinaryIO:
+        return self._path(area, name).open("rb")
+
+    @contextmanager
+    def local_copy(self, area: str, name: str) -> Iterator[Path]:
+        path = self._path(area, name)
+        if not path.is_file():
+            raise FileNotFoundError(name)
+        yield path
+
+    @contextmanager
+    def writable_path(self, area: str, name: str) -> Iterator[Path]:
+        path = self._path(area, name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        yield path
+
+    def delete(self, area: str, name: str):
+        self._path(area, name).unlink()
+
+    def exists(self, area: str, name: str) -> bool:
+        return self._path(area, name).is_file()
+
+    def version(self, area: str, name: str) -> str:
+        stat = self._path(area, name).stat()
+        return f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+
+    def list_files(self, area: str) -> List[Dict[str, Any]]:
+        directory = self.directories[area]
+        if not directory.exists():
+            return []
+
+        files = []
+        for file_path in directory.iterdir():
+            if file_path.is_file():
+                stat = file_path.stat()
+                files.append(
+                    {
+                        "name": file_path.name,
+                        "size": stat.st_size,
+                        "modified": stat.st_mtime,
+                    }
+                )
+        return files
+
+
+class S3Storage(StorageBackend):
+    """
+    Storage in an S3-compatible object store.
+
+    Sources are fetched into a local read-through cache so repeated merges
+    don't download them again; cached copies are revalidated by ETag.
+    Cached files handed out by local_copy() are pinned and never evicted
+    while in use.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        cache_dir: Path,
+        prefix: str = "",
+        endpoint_url: Optional[str] = None,
+        region_name: Optional[str] = None,
+        cache_max_bytes: int = 1024 * 1024 * 1024,
+        multipart_threshold: int = 16 * 1024 * 1024,
+        client: Any = None,
+    ):
+        import boto3
+        from boto3.s3.transfer import TransferConfig
+
+        self.bucket = bucket
+        self.prefix = prefix
+        self.cache_dir = cache_dir
+        self.cache_max_bytes = cache_max_bytes
+        self.client = client or boto3.client(
+            "s3", endpoint_url=endpoint_url, region_name=region_name
+        )
+        # Files above the threshold are sent as multipart uploads
+        self.transfer_config = TransferConfig(
+            multipart_threshold=multipart_threshold,
+            multipart_chunksize=multipart_threshold,
+        )
+        self._cached_etags: Dict[str, str] = {}
+        # Reference counts of cache files in use
+        self._pins: Dict[Path, int] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, area: str, name: str) -> str:
+        return f"{self.prefix}{area}/{Path(name).name}"
+
+    def _cache_path(self, area: str, name: str) -> Path:
+        return self.cache_dir / area / Path(name).name
+
+    def ensure_ready(self):
+        for area in AREAS:
+            (self.cache_dir / area).mkdir(parents=True, exist_ok=True)
+
+    def save(self, area: str, name: str, fileobj: BinaryIO) -> int:
+        # Write through the cache: the upload is usually processed right away
+        with self._staged(area, name) as staging_path:
+            with staging_path.open("wb") as buffer:
+                shutil.copyfileobj(fileobj, buffer, CHUNK_SIZE)
+            size = staging_path.stat().st_size
+        self._evict_cache()
+        return size
+
+    @contextmanager
+    def _staged(self, area: str, name: str) -> Iterator[Path]:
+        """
+        Yield a temporary file to write; on exit it is uploaded and moved
+        over the cached copy.
+
+        A cached copy in use is replaced, never truncated in place, so
+        readers that have it open keep seeing the previous version.
+        """
+        key = self._key(area, name)
+        cache_path = self._cache_path(area, name)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(
+            dir=cache_path.parent, prefix=f".{cache_path.name}.", suffix=".part"
+        )
+        os.close(fd)
+        staging_path = Path(tmp_name)
+        try:
+            yield staging_path
+            self.client.upload_file(
+                tmp_name, self.bucket, key, Config=self.transfer_config
+            )
+            etag = self.client.head_object(Bucket=self.bucket, Key=key)["ETag"]
+            os.replace(tmp_name, cache_path)
+        except BaseException:
+            staging_path.unlink(missing_ok=True)
+            raise
+        # Recorded only once the cache holds the uploaded content
+        self._cached_etags[key] = etag
+
+    def open(self, area: str, name: str) -> BinaryIO:
+        try:
+            response = self.client.get_object(
+                Bucket=self.bucket, Key=self._key(area, name)
+            )
+        except self.client.exceptions.NoSuchKey:
+            raise FileNotFoundError(name)
+        return response["Body"]
+
+    @contextmanager
+    def _pinned(self, path: Path) -> Iterator[Path]:
+        """Protect a cache file from eviction while the context is open."""
+        with self._lock:
+            self._pins[path] = self._pins.get(path, 0) + 1
+        try:
+            yield path
+        finally:
+            with self._lock:
+                self._pins[path] -= 1
+                if not self._pins[path]:
+                    del self._pins[path]
+
+    @contextmanager
+    def local_copy(self, area: str, name: str) -> Iterator[Path]:
+        with self._pinned(self._cache_path(area, name)) as cache_path:
+            self._fetch(area, name, cache_path)
+            yield cache_path
+
+    def _fetch(self, area: str, name: str, cache_path: Path):
+        """Make sure the cache holds the current version of a file."""
+        key = self._key(area, name)
+        head = self._head(area, name)
+
+        if cache_path.is_file() and self._cached_etags.get(key) == head["ETag"]:
+            # Mark as recently used for eviction
+            os.utime(cache_path)
+            return
+
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=cache_path.parent, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as buffer:
+                self.client.download_fileobj(
+                    self.bucket, key, buffer, Config=self.transfer_config
+                )
+            os.replace(tmp_name, cache_path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+        self._cached_etags[key] = head["ETag"]
+        self._evict_cache()
+
+    @contextmanager
+    def writable_path(self, area: str, name: str) -> Iterator[Path]:
+        with self._staged(area, name) as staging_path:
+            yield staging_path
+        self._evict_cache()
+
+    def delete(self, area: str, name: str):
+        key = self._key(area, name)
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+        self._cached_etags.pop(key, None)
+        # A copy still in use is left for eviction to remove later
+        cache_path = self._cache_path(area, name)
+        with self._lock:
+            if cache_path not in self._pins:
+                cache_path.unlink(missing_ok=True)
+
+    def list_files(self, area: str) -> List[Dict[str, Any]]:
+        area_prefix = f"{self.prefix}{area}/"
+        paginator = self.client.get_paginator("list_objects_v2")
+
+        files = []
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=area_prefix):
+            for obj in page.get("Contents", []):
+                files.append(self._file_info(obj, area_prefix))
+        return files
+
+    def find(self, area: str, prefix: str) -> Optional[Dict[str, Any]]:
+        # Let S3 filter by prefix instead of listing the whole area
+        area_prefix = f"{self.prefix}{area}/"
+        response = self.client.list_objects_v2(
+            Bucket=self.bucket, Prefix=f"{area_prefix}{prefix}", MaxKeys=1
+        )
+        for obj in response.get("Contents", []):
+            return self._file_info(obj, area_prefix)
+        return None
+
+    @staticmethod
+    def _file_info(obj: Dict[str, Any], area_prefix: str) -> Dict[str, Any]:
+        return {
+            "name": obj["Key"][len(area_prefix):],
+            "size": obj["Size"],
+            "modified": obj["LastModified"].timestamp(),
+        }
+
+    def exists(self, area: str, name: str) -> bool:
+        # Only a missing key means False; throttling and other errors raise
+        try:
+            self._head(area, name)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def version(self, area: str, name: str) -> str:
+        return self._head(area, name)["ETag"].strip('"')
+
+    def _head(self, area: str, name: str) -> Dict[str, Any]:
+        try:
+            return self.client.head_object(
+                Bucket=self.bucket, Key=self._key(area, name)
+            )
+        except self.client.exceptions.ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey"):
+                raise FileNotFoundError(name)
+            raise
+
+    def _evict_cache(self):
+        """
+        Remove least recently used cache files beyond the size limit.
+
+        Every cached file counts toward the limit, but pinned files are
+        never removed, so the cache may stay above it while they are in use.
+        """
+        with self._lock:
+            cached = []
+            for path in self.cache_dir.rglob("*"):
+                try:
+                    if path.is_file() and path.suffix != ".part":
+                        stat = path.stat()
+                        cached.append((stat.st_mtime, stat.st_size, path))
+                except FileNotFoundError:
+                    continue
+
+            total = sum(size for _, size, _ in cached)
+            for _, size, path in sorted(cached, key=lambda entry: entry[0]):
+                if total <= self.cache_max_bytes:
+                    break
+                if path in self._pins:
+                    continue
+                try:
+                    path.unlink()
+                    total -= size
+                except Exception as e:
+                    logger.error(f"Failed to evict cached file {path}: {e}")
+
+
+@lru_cache
+def get_storage() -> StorageBackend:
+    settings = get_settings()
+
+    if settings.storage_backend == "s3":
+        return S3Storage(
+            bucket=settings.s3_bucket,
+            cache_dir=settings.storage_cache_dir,
+            prefix=settings.s3_prefix,
+            endpoint_url=settings.s3_endpoint_url,
+            region_name=settings.s3_region,
+            cache_max_bytes=settings.storage_cache_max_mb * 1024 * 1024,
+            multipart_threshold=settings.s3_multipart_threshold_mb * 1024 * 1024,
+        )
+
+    return LocalStorage(settings.uploads_dir, settings.output_dir)
@@ -0,0 +1,57 @@
+"""In-memory LRU cache for rendered page tiles."""
+
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from ..core.config import get_settings
+
+# (source_pdf, version, page_number, zoom, x, y)
+TileKey = Tuple[str, str, int, int, int, int]
+
+
+class TileCache:
+    """Size-bounded least-recently-used cache of encoded tiles."""
+
+    def __init__(self, max_bytes: int = 128 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._tiles: "OrderedDict[TileKey, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: TileKey) -> Optional[bytes]:
+        with self._lock:
+            data = self._tiles.get(key)
+            if data is not None:
+                self._tiles.move_to_end(key)
+            return data
+
+    def put(self, key: TileKey, data: bytes):
+        if len(data) > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._tiles.pop(key, None)
+            if previous is not None:
+                self.total_bytes -= len(previous)
+
+            self._tiles[key] = data
+            self.total_bytes += len(data)
+
+            while self.total_bytes > self.max_bytes:
+                _, evicted = self._tiles.popitem(last=False)
+                self.total_bytes -= len(evicted)
+
+    def invalidate(self, source_pdf: str) -> int:
+        """Drop every cached tile of a document."""
+        with self._lock:
+            keys = [key for key in self._tiles if key[0] == source_pdf]
+            for key in keys:
+                self.total_bytes -= len(self._tiles.pop(key))
+            return len(keys)
+
+
+@lru_cache
+def get_tile_cache() -> TileCache:
+    return TileCache(get_settings().tile_cache_max_mb * 1024 * 1024)
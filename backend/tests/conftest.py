@@ -0,0 +1,17 @@
+import fitz
+import pytest
+
+
+@pytest.fixture
+def make_pdf():
+    """Return a helper that writes a PDF with one page per text."""
+
+    def make(path, page_texts, width=595, height=842):
+        doc = fitz.open()
+        for text in page_texts:
+            doc.new_page(width=width, height=height).insert_text((10, 40), text)
+        doc.save(path)
+        doc.close()
+        return path
+
+    return make
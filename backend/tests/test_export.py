@@ -0,0 +1,130 @@
+import asyncio
+import io
+import zipfile
+import pytest
+from PIL import Image
+from contextlib import contextmanager
+from app.api import routes
+from app.services import pdf_service
+from app.services.pdf_service import PDFService
+from app.services.storage_service import LocalStorage
+
+
+@pytest.fixture(scope="module", autouse=True)
+def render_pool():
+    yield
+    PDFService.shutdown_workers()
+
+
+def test_parse_page_ranges():
+    assert PDFService.parse_page_ranges(None, 3) == [1, 2, 3]
+    assert PDFService.parse_page_ranges("2-3, 1, 4-", 5) == [2, 3, 1, 4, 5]
+    with pytest.raises(ValueError):
+        PDFService.parse_page_ranges("2-9", 5)
+    with pytest.raises(ValueError):
+        PDFService.parse_page_ranges("a", 5)
+
+
+@pytest.mark.parametrize(
+    "image_format, extension", [("png", "png"), ("jpeg", "jpg"), ("webp", "webp")]
+)
+def test_export_streams_zip_of_page_images(
+    tmp_path, make_pdf, image_format, extension
+):
+    pdf_path = tmp_path / "doc.pdf"
+    make_pdf(pdf_path, [f"Page {n}" for n in range(1, 6)], width=144, height=72)
+    jobs = [
+        {"pdf_path": pdf_path, "page_number": 4},
+        {"pdf_path": pdf_path, "page_number": 2, "rotation": 90},
+    ]
+
+    chunks = list(
+        PDFService.export_page_images(
+            jobs, image_format=image_format, dpi=144, max_workers=2
+        )
+    )
+    assert len(chunks) == len(jobs) + 1
+
+    with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as archive:
+        names = sorted(archive.namelist())
+        assert names == [
+            f"0001_doc_page4.{extension}",
+            f"0002_doc_page2.{extension}",
+        ]
+        first = Image.open(io.BytesIO(archive.read(names[0])))
+        rotated = Image.open(io.BytesIO(archive.read(names[1])))
+
+    assert first.size == (288, 144)
+    assert rotated.size == (144, 288)
+
+
+def test_failed_export_is_logged(tmp_path, make_pdf, caplog):
+    pdf_path = make_pdf(tmp_path / "doc.pdf", ["Only page"])
+    jobs = [{"pdf_path": pdf_path, "page_number": 2}]
+
+    with pytest.raises(Exception):
+        list(PDFService.export_page_images(jobs, max_workers=1))
+
+    assert "Image export failed after 0 of 1 pages" in caplog.text
+
+
+def test_broken_pool_is_replaced_once():
+    broken = pdf_service._get_render_pool(1)
+    pdf_service._discard_render_pool(broken)
+    replacement = pdf_service._get_render_pool(1)
+
+    # A second export failing on the same pool keeps the replacement
+    pdf_service._discard_render_pool(broken)
+    assert replacement is not broken
+    assert pdf_service._get_render_pool(1) is replacement
+
+
+def test_export_caps_pixels_per_page(tmp_path, make_pdf, monkeypatch):
+    pdf_path = make_pdf(tmp_path / "poster.pdf", ["Poster"], width=2400, height=3600)
+    monkeypatch.setattr(pdf_service, "MAX_EXPORT_PIXELS", 1_000_000)
+
+    data = pdf_service._render_page_image(str(pdf_path), 1, None, 600, "png", 85)
+
+    image = Image.open(io.BytesIO(data))
+    assert image.width * image.height <= 1_000_000
+
+
+class CountingStorage(LocalStorage):
+    """Local storage that tracks how many copies are held open."""
+
+    open_copies = 0
+
+    @contextmanager
+    def local_copy(self, area, name):
+        with super().local_copy(area, name) as path:
+            CountingStorage.open_copies += 1
+            try:
+                yield path
+            finally:
+                CountingStorage.open_copies -= 1
+
+
+def test_export_route_holds_sources_while_streaming(
+    tmp_path, make_pdf, monkeypatch
+):
+    make_pdf(tmp_path / "doc.pdf", ["One", "Two"], width=144, height=72)
+    storage = CountingStorage(tmp_path, tmp_path / "output")
+    monkeypatch.setattr(routes, "get_storage", lambda: storage)
+    request = routes.ExportImagesRequest(source_pdf="doc.pdf", dpi=72)
+
+    async def stream(started):
+        response = routes.export_images(request, True)
+        chunks = [await response.body_iterator.__anext__()] if started else []
+        response.background.func()
+        held = CountingStorage.open_copies
+        chunks += [chunk async for chunk in response.body_iterator]
+        return held, chunks
+
+    # Streaming started: the background task must leave the pins alone
+    held, chunks = asyncio.run(stream(started=True))
+    assert held == 1 and len(chunks) == 3
+    assert CountingStorage.open_copies == 0
+
+    # Streaming never started: the background task releases them
+    held, chunks = asyncio.run(stream(started=False))
+    assert held == 0 and chunks == []
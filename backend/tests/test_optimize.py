@@ -0,0 +1,70 @@
+import io
+import os
+import fitz
+from PIL import Image
+from app.services.pdf_service import PDFService
+from app.services.storage_service import LocalStorage
+
+
+def make_scanned_pdf(path, size):
+    # Noise compresses poorly, like a real scan
+    img = Image.frombytes("RGB", (size, size), os.urandom(size * size * 3))
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_image(fitz.Rect(72, 72, 216, 216), stream=buffer.getvalue())
+    doc.save(path)
+    doc.close()
+
+
+def test_optimize_downsamples_large_images(tmp_path):
+    make_scanned_pdf(tmp_path / "scan.pdf", 1200)
+    page_order = [{"source_pdf": "scan.pdf", "page_number": 1}]
+
+    result = PDFService.create_pdf_from_pages(
+        page_order,
+        tmp_path / "merged.pdf",
+        LocalStorage(tmp_path, tmp_path / "output"),
+        {"target_dpi": 150, "jpeg_quality": 75, "max_workers": 2},
+    )
+
+    assert result["images_optimized"] == 1
+    assert result["file_size"] < result["original_size"]
+
+    doc = fitz.open(tmp_path / "merged.pdf")
+    xref = doc[0].get_images()[0][0]
+    assert doc.extract_image(xref)["width"] == 300
+    doc.close()
+
+
+def test_optimize_skips_low_resolution_images(tmp_path):
+    make_scanned_pdf(tmp_path / "scan.pdf", 200)
+    page_order = [{"source_pdf": "scan.pdf", "page_number": 1}]
+
+    result = PDFService.create_pdf_from_pages(
+        page_order,
+        tmp_path / "merged.pdf",
+        LocalStorage(tmp_path, tmp_path / "output"),
+        {"target_dpi": 150},
+    )
+
+    assert result["images_optimized"] == 0
+    assert result["file_size"] == result["original_size"]
+
+
+def test_optimize_reports_bytes_saved(tmp_path):
+    make_scanned_pdf(tmp_path / "scan.pdf", 1200)
+    source = fitz.open(tmp_path / "scan.pdf")
+    doc = fitz.open()
+    for _ in range(3):
+        doc.insert_pdf(source)
+    before = len(doc.tobytes(garbage=3, deflate=True))
+
+    # A window of two images at a time still reaches every image
+    result = PDFService.optimize_images(doc, target_dpi=150, max_workers=1)
+    after = len(doc.tobytes(garbage=3, deflate=True))
+
+    assert result["images_optimized"] == 3
+    assert abs(result["bytes_saved"] - (before - after)) < 0.01 * before
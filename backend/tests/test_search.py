@@ -0,0 +1,90 @@
+import asyncio
+import os
+from app.services.cleanup_service import CleanupService
+from app.services.pdf_service import PDFService
+from app.services.search_service import SearchIndex
+from app.services.storage_service import LocalStorage, UPLOADS
+
+
+def test_extract_pages_indexes_text(tmp_path, make_pdf):
+    index = SearchIndex(tmp_path / "index.db")
+    pdf_path = tmp_path / "invoice.pdf"
+    make_pdf(pdf_path, ["Quarterly report", "Invoice total due"])
+
+    PDFService.extract_pages(pdf_path, index)
+
+    results = index.search("invoice")
+    assert [(r["source_pdf"], r["page_number"]) for r in results] == [
+        ("invoice.pdf", 2)
+    ]
+    snippet = results[0]["snippet"]
+    [[start, end]] = results[0]["highlights"]
+    assert snippet[start:end] == "Invoice"
+    assert index.search('"unbalanced') == []
+
+
+def test_snippets_are_plain_text(tmp_path):
+    index = SearchIndex(tmp_path / "index.db")
+    index.index_document("evil.pdf", ["hello <img src=x onerror=alert(1)>"])
+
+    [result] = index.search("hello")
+
+    assert result["snippet"] == "hello <img src=x onerror=alert(1)>"
+    assert result["highlights"] == [[0, 5]]
+
+
+def test_cleanup_removes_index_rows(tmp_path, make_pdf):
+    uploads_dir = tmp_path / "uploads"
+    output_dir = tmp_path / "output"
+    uploads_dir.mkdir()
+    index = SearchIndex(tmp_path / "index.db")
+    pdf_path = uploads_dir / "report.pdf"
+    make_pdf(pdf_path, ["Annual report"])
+    PDFService.extract_pages(pdf_path, index)
+
+    cleanup_service = CleanupService(LocalStorage(uploads_dir, output_dir), index)
+    asyncio.run(cleanup_service.cleanup_all_files())
+
+    assert index.search("annual") == []
+
+
+def test_nodes_share_uploads_through_storage(tmp_path, make_pdf):
+    storage = LocalStorage(tmp_path / "uploads", tmp_path / "output")
+    node_a = SearchIndex(tmp_path / "a.db")
+    node_b = SearchIndex(tmp_path / "b.db")
+    storage.ensure_ready()
+    make_pdf(tmp_path / "uploads" / "memo.pdf", ["Shared memo"])
+    PDFService.extract_pages(tmp_path / "uploads" / "memo.pdf", node_a)
+
+    # Node B picks up the upload handled by node A
+    assert PDFService.sync_search_index(storage, node_b) == 1
+    assert [r["source_pdf"] for r in node_b.search("memo")] == ["memo.pdf"]
+
+    # Cleanup on node B; node A must not return the deleted source
+    asyncio.run(CleanupService(storage, node_b).cleanup_all_files())
+    exists = lambda name: storage.exists(UPLOADS, name)
+    assert node_a.search("memo", source_exists=exists) == []
+    assert node_a.indexed_documents() == set()
+
+
+def test_sync_does_not_retry_failed_uploads(tmp_path, make_pdf, monkeypatch):
+    storage = LocalStorage(tmp_path / "uploads", tmp_path / "output")
+    index = SearchIndex(tmp_path / "index.db")
+    storage.ensure_ready()
+    (tmp_path / "uploads" / "broken.pdf").write_bytes(b"not a pdf")
+    failed = {}
+
+    assert PDFService.sync_search_index(storage, index, failed) == 0
+    assert list(failed) == ["broken.pdf"]
+
+    attempts = []
+    monkeypatch.setattr(PDFService, "extract_text", attempts.append)
+    assert PDFService.sync_search_index(storage, index, failed) == 0
+    assert attempts == []
+    monkeypatch.undo()
+
+    # A replacement upload is tried again
+    make_pdf(tmp_path / "uploads" / "broken.pdf", ["Fixed upload"])
+    os.utime(tmp_path / "uploads" / "broken.pdf", (1, 1))
+    assert PDFService.sync_search_index(storage, index, failed) == 1
+    assert failed == {}
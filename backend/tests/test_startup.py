@@ -0,0 +1,85 @@
+"""Startup time budget: import time and time to first healthy /api/health."""
+
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Budgets in seconds; override on slow CI machines
+IMPORT_BUDGET = float(os.getenv("STARTUP_IMPORT_BUDGET", "1.5"))
+HEALTHY_BUDGET = float(os.getenv("STARTUP_HEALTHY_BUDGET", "4.0"))
+
+HEAVY_MODULES = ["fitz", "pymupdf", "PIL.Image", "boto3"]
+
+
+def run_python(code, cwd):
+    env = {**os.environ, "PYTHONPATH": str(BACKEND_DIR)}
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stdout
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_import_is_fast_and_lazy(tmp_path):
+    output = run_python(
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        "import app.main\n"
+        "print(time.perf_counter() - start)\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n",
+        tmp_path,
+    )
+    import_time, loaded = output.split("\n")[:2]
+    print(f"import app.main: {float(import_time) * 1000:.0f} ms")
+
+    assert loaded == "", f"heavy modules imported eagerly: {loaded}"
+    assert float(import_time) < IMPORT_BUDGET
+    # Directory setup belongs to the lifespan, not import
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_time_to_first_healthy(tmp_path):
+    port = free_port()
+    env = {**os.environ, "PYTHONPATH": str(BACKEND_DIR)}
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)],
+        cwd=tmp_path,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        healthy_after = None
+        while time.perf_counter() - start < HEALTHY_BUDGET * 2:
+            try:
+                resp = httpx.get(f"http://127.0.0.1:{port}/api/health", timeout=1)
+                if resp.status_code == 200:
+                    healthy_after = time.perf_counter() - start
+                    break
+            except httpx.TransportError:
+                pass
+            time.sleep(0.02)
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+    assert healthy_after is not None, "server never became healthy"
+    print(f"time to first healthy /api/health: {healthy_after * 1000:.0f} ms")
+    assert healthy_after < HEALTHY_BUDGET
@@ -0,0 +1,129 @@
+import asyncio
+import io
+import os
+import boto3
+import pytest
+from botocore.exceptions import ClientError
+from moto import mock_aws
+from app.services.cleanup_service import CleanupService
+from app.services.pdf_service import PDFService
+from app.services.storage_service import S3Storage, UPLOADS, OUTPUT
+
+
+@pytest.fixture
+def s3_storage(tmp_path, monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket="pdftoolkit")
+        storage = S3Storage(
+            "pdftoolkit",
+            tmp_path / "cache",
+            multipart_threshold=5 * 1024 * 1024,
+            client=client,
+        )
+        storage.ensure_ready()
+        yield storage
+
+
+def test_read_through_cache_revalidates(s3_storage):
+    s3_storage.save(UPLOADS, "a.pdf", io.BytesIO(b"first"))
+    with s3_storage.local_copy(UPLOADS, "a.pdf") as cached:
+        assert cached.read_bytes() == b"first"
+    first_version = s3_storage.version(UPLOADS, "a.pdf")
+
+    # Another node overwrites the object; the stale copy must be refetched
+    s3_storage.client.put_object(
+        Bucket="pdftoolkit", Key="uploads/a.pdf", Body=b"second"
+    )
+    with s3_storage.local_copy(UPLOADS, "a.pdf") as cached:
+        assert cached.read_bytes() == b"second"
+    assert s3_storage.version(UPLOADS, "a.pdf") != first_version
+
+    with pytest.raises(FileNotFoundError):
+        with s3_storage.local_copy(UPLOADS, "missing.pdf"):
+            pass
+
+
+def test_eviction_spares_pinned_copies(s3_storage, tmp_path, make_pdf):
+    for name, text in [("a.pdf", "first"), ("b.pdf", "second")]:
+        with make_pdf(tmp_path / name, [text]).open("rb") as source:
+            s3_storage.save(UPLOADS, name, source)
+    s3_storage.cache_max_bytes = 500
+
+    # a.pdf is reopened after b.pdf pushed the cache over its limit
+    with s3_storage.writable_path(OUTPUT, "abc_merged.pdf") as output_path:
+        result = PDFService.create_pdf_from_pages(
+            [
+                {"source_pdf": "a.pdf", "page_number": 1},
+                {"source_pdf": "b.pdf", "page_number": 1},
+                {"source_pdf": "a.pdf", "page_number": 1},
+            ],
+            output_path,
+            s3_storage,
+        )
+    assert result["page_count"] == 3
+
+    # Once released, the copies count toward the limit and are evicted
+    s3_storage.save(UPLOADS, "c.pdf", io.BytesIO(b"x" * 100))
+    cached = [p for p in s3_storage.cache_dir.rglob("*") if p.is_file()]
+    assert sum(p.stat().st_size for p in cached) <= 500
+
+
+def test_large_outputs_use_multipart_upload(s3_storage):
+    data = os.urandom(11 * 1024 * 1024)
+    with s3_storage.writable_path(OUTPUT, "big.pdf") as path:
+        path.write_bytes(data)
+
+    head = s3_storage.client.head_object(Bucket="pdftoolkit", Key="output/big.pdf")
+    assert head["ETag"].strip('"').endswith("-3")
+    assert b"".join(s3_storage.iter_chunks(OUTPUT, "big.pdf")) == data
+
+
+def test_merge_and_cleanup_through_s3(s3_storage, tmp_path, make_pdf):
+    with make_pdf(tmp_path / "src.pdf", ["hello"]).open("rb") as source:
+        s3_storage.save(UPLOADS, "src.pdf", source)
+
+    with s3_storage.writable_path(OUTPUT, "abc_merged.pdf") as output_path:
+        result = PDFService.create_pdf_from_pages(
+            [{"source_pdf": "src.pdf", "page_number": 1}], output_path, s3_storage
+        )
+    assert result["page_count"] == 1
+    assert s3_storage.find(OUTPUT, "abc_")["name"] == "abc_merged.pdf"
+
+    asyncio.run(CleanupService(s3_storage).cleanup_all_files())
+    assert s3_storage.list_files(UPLOADS) == []
+    assert s3_storage.list_files(OUTPUT) == []
+    assert not (tmp_path / "cache" / UPLOADS / "src.pdf").exists()
+
+
+def test_reupload_does_not_truncate_copy_in_use(s3_storage):
+    s3_storage.save(UPLOADS, "a.pdf", io.BytesIO(b"first"))
+    with s3_storage.local_copy(UPLOADS, "a.pdf") as cached:
+        with cached.open("rb") as reader:
+            s3_storage.save(UPLOADS, "a.pdf", io.BytesIO(b"second"))
+            assert reader.read() == b"first"
+
+    with s3_storage.local_copy(UPLOADS, "a.pdf") as cached:
+        assert cached.read_bytes() == b"second"
+    assert not list(s3_storage.cache_dir.rglob("*.part"))
+
+
+def test_find_lists_only_matching_keys(s3_storage):
+    for name in ["aaa_one.pdf", "bbb_two.pdf"]:
+        s3_storage.save(OUTPUT, name, io.BytesIO(b"pdf"))
+
+    assert s3_storage.find(OUTPUT, "bbb_")["name"] == "bbb_two.pdf"
+    assert s3_storage.find(OUTPUT, "ccc_") is None
+
+
+def test_exists_raises_on_errors_other_than_missing(s3_storage, monkeypatch):
+    assert not s3_storage.exists(UPLOADS, "missing.pdf")
+
+    def throttled(**kwargs):
+        raise ClientError({"Error": {"Code": "503"}}, "HeadObject")
+
+    monkeypatch.setattr(s3_storage.client, "head_object", throttled)
+    with pytest.raises(ClientError):
+        s3_storage.exists(UPLOADS, "missing.pdf")
@@ -0,0 +1,93 @@
+import io
+import os
+import fitz
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+from app.api import routes
+from app.core.config import get_settings
+from app.main import app
+from app.services.pdf_service import PDFService, TILE_SIZE
+from app.services.storage_service import LocalStorage
+from app.services.tile_cache import TileCache
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    path = tmp_path / "letter.pdf"
+    doc = fitz.open()
+    page = doc.new_page(width=612, height=792)
+    # Fine print in the bottom-right corner
+    page.draw_rect(fitz.Rect(562, 742, 602, 782), fill=(1, 0, 0))
+    doc.save(path)
+    doc.close()
+    return path
+
+
+def test_pyramid_levels_double_in_scale(pdf_path):
+    pyramid = PDFService.get_tile_pyramid(pdf_path, 1)
+    levels = pyramid["levels"]
+
+    assert levels[0]["columns"] == levels[0]["rows"] == 1
+    assert levels[1]["scale"] == pytest.approx(levels[0]["scale"] * 2)
+    assert levels[-1]["scale"] >= 8
+
+
+def test_render_tile_covers_only_its_region(pdf_path):
+    level = PDFService.get_tile_pyramid(pdf_path, 1)["levels"][3]
+    x, y = level["columns"] - 1, level["rows"] - 1
+
+    tile = Image.open(io.BytesIO(PDFService.render_tile(pdf_path, 1, 3, x, y)))
+
+    assert tile.width <= TILE_SIZE + 1 and tile.height <= TILE_SIZE + 1
+    assert (255, 0, 0) in [color for _, color in tile.getcolors(1 << 16)]
+
+    with pytest.raises(ValueError):
+        PDFService.render_tile(pdf_path, 1, 3, level["columns"], 0)
+
+
+def test_tile_cache_evicts_least_recently_used():
+    cache = TileCache(max_bytes=10)
+    cache.put(("a.pdf", "v1", 1, 0, 0, 0), b"12345")
+    cache.put(("b.pdf", "v1", 1, 0, 0, 0), b"12345")
+    cache.get(("a.pdf", "v1", 1, 0, 0, 0))
+    cache.put(("b.pdf", "v1", 1, 1, 0, 0), b"12345")
+
+    assert cache.get(("a.pdf", "v1", 1, 0, 0, 0)) == b"12345"
+    assert cache.get(("b.pdf", "v1", 1, 0, 0, 0)) is None
+    assert cache.invalidate("a.pdf") == 1
+    assert cache.total_bytes == 5
+
+
+def test_tile_urls_carry_the_document_version(pdf_path, monkeypatch):
+    storage = LocalStorage(pdf_path.parent, pdf_path.parent / "output")
+    monkeypatch.setattr(routes, "get_storage", lambda: storage)
+    client = TestClient(app)
+    headers = {"X-API-Key": get_settings().api_key}
+
+    pyramid = client.get("/api/tiles/letter.pdf/1", headers=headers).json()
+    resp = client.get(
+        "/api/tiles/letter.pdf/1/0/0/0",
+        params={"v": pyramid["version"]},
+        headers=headers,
+    )
+    assert resp.status_code == 200
+    assert "immutable" in resp.headers["Cache-Control"]
+
+    # Replaced content gets a new version; old tile URLs stop resolving
+    doc = fitz.open()
+    doc.new_page(width=300, height=300)
+    doc.save(pdf_path)
+    doc.close()
+    os.utime(pdf_path, ns=(0, 0))
+
+    assert client.get("/api/tiles/letter.pdf/1", headers=headers).json()[
+        "version"
+    ] != pyramid["version"]
+    # Also for the tile fetched above, which is still in the tile cache
+    resp = client.get(
+        "/api/tiles/letter.pdf/1/0/0/0",
+        params={"v": pyramid["version"]},
+        headers=headers,
+    )
+    assert resp.status_code == 404